@@ -2,26 +2,123 @@
 
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime
+from itertools import cycle
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.patches import Wedge
 import seaborn as sns
 from PySide6.QtWidgets import (QMessageBox, QTableWidgetItem, QLabel, QSlider, 
                                QWidget, QVBoxLayout, QTabWidget)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _pie_geometry(sizes, start_angle=90.0):
+    """
+    Compute pie wedge angles and label directions for positive slice sizes,
+    matching the layout ax.pie produces.
+    
+    Args:
+        sizes: 1-D array of positive slice values
+        start_angle: Angle in degrees where the first wedge starts
+        
+    Returns:
+        tuple: (fractions, wedge boundary angles of length n + 1,
+                unit x and y offsets of each wedge midpoint)
+    """
+    fracs = sizes / sizes.sum()
+    thetas = np.empty(len(sizes) + 1)
+    thetas[0] = 0.0
+    np.cumsum(fracs, out=thetas[1:])
+    thetas *= 360.0
+    thetas += start_angle
+    mid_angles = np.deg2rad((thetas[:-1] + thetas[1:]) * 0.5)
+    return fracs, thetas, np.cos(mid_angles), np.sin(mid_angles)
+
 class PortfolioStudyController:
     """
     Enhanced controller for portfolio study functionality.
     Provides efficient data retrieval and visualisation using pre-calculated metrics.
     """
+    # Maximum number of fetched result sets kept in the data cache
+    DATA_CACHE_SIZE = 16
+
+    # Conditions marking a final_metrics row as active for each dividend filter
+    _ACTIVITY_CONDITIONS = {
+        None: "fm.market_value > 0",
+        'cash': "fm.cash_dividend > 0",
+        'drp': "fm.drp_share > 0",
+        'combined': "(fm.cash_dividend > 0 OR fm.drp_share > 0)"
+    }
+
+    # Delay (ms) after the last slider movement before the distribution pie is redrawn
+    SLIDER_REDRAW_DELAY = 40
+
+    # Database columns required by each study type
+    _STUDY_FIELDS = {
+        'market_value': ('market_value',),
+        'profitability': ('total_return', 'market_value', 'daily_pl', 'daily_pl_pct', 'total_return_pct', 'cumulative_return_pct'),
+        'dividend_performance': ('cash_dividend', 'cash_dividends_total', 'drp_share', 'drp_shares_total', 'close_price')
+    }
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
         self.view = None
         self.current_portfolio = None
+        self._charts_tab = None
+        self._ax = None
+        self._draw_cid = None
+        self._redraw_timer = None
+        self._pending_pos = 0
+        self._last_pos = -1
+        self._pie_wedges = {}
+        self._pie_texts = {}
+        self._pie_autotexts = {}
+        self._pie_collection = None
         self.data = None
+        self._data_version = 0
+        self._stats_cache = {}
+        self._views = {}
+        self._data_source = None
+        self._dates = np.array([], dtype='datetime64[ns]')
+        
+        # Only rows showing activity of the requested kind are aggregated, so the filter
+        # is applied while scanning instead of after grouping every row in the range
+        self._active_stock_queries = {
+            dividend_type: f"""
+                SELECT 
+                    s.id,
+                    s.yahoo_symbol,
+                    s.name,
+                    COUNT(*) as active_days,
+                    MAX(fm.market_value) as max_value
+                FROM stocks s
+                JOIN portfolio_stocks ps ON s.id = ps.stock_id
+                JOIN final_metrics fm ON s.id = fm.stock_id
+                WHERE fm.date BETWEEN :start_date AND :end_date
+                AND ps.portfolio_id = :portfolio_id
+                AND {condition}
+                GROUP BY s.id, s.yahoo_symbol, s.name
+                ORDER BY s.yahoo_symbol;
+            """
+            for dividend_type, condition in self._ACTIVITY_CONDITIONS.items()
+        }
+        
+        self._stats_builders = {
+            'market_value': self._stats_market_value,
+            'profitability': self._stats_profitability,
+            'dividend_performance': self._stats_dividends,
+            'portfolio_distribution': self._stats_distribution
+        }
+        self.wide = {}
+        self.wide_ffilled = {}
+        self._pivot_cache = None
+        self._data_cache = OrderedDict()
     
     def set_view(self, view):
         """
@@ -33,13 +130,27 @@ class PortfolioStudyController:
         self.view = view
         self.view.set_controller(self)
         self.view.update_plot.connect(self.analyse_portfolio)
+        
+        # Find the charts tab once; it hosts the distribution time slider
+        self._charts_tab = None
+        tab_widget = self.view.findChild(QTabWidget)
+        if tab_widget:
+            for i in range(tab_widget.count()):
+                if tab_widget.tabText(i) == "Charts":
+                    self._charts_tab = tab_widget.widget(i)
+                    break
     
     def set_portfolio(self, portfolio):
         """Set the current portfolio."""
         self.current_portfolio = portfolio
+        self.clear_data_cache()
         if self.view:
             self.view.update_portfolio_stocks(portfolio.stocks.values())
 
+    def clear_data_cache(self):
+        """Discard all cached query results so the next request re-reads the database."""
+        self._data_cache.clear()
+
     def get_portfolio_data(self, params):
         """
         Get portfolio metrics data based on study parameters.
@@ -51,86 +162,189 @@ class PortfolioStudyController:
             pd.DataFrame: DataFrame containing requested metrics
         """
         try:
-            # Get unique fields for the query
-            fields = ['date']  # Always include date
-
-            # Map study types to database columns
-            study_type_mapping = {
-                'market_value': ['market_value'],  # Changed to list for consistency
-                'profitability': ['total_return', 'market_value', 'daily_pl', 'daily_pl_pct', 'total_return_pct', 'cumulative_return_pct'],
-                'dividend_performance': ['cash_dividend', 'cash_dividends_total', 'drp_share', 'drp_shares_total', 'close_price']
-            }
-            
-            # Always include market_value for distribution charts
-            fields.append('market_value')
-            
-            # Add required fields based on study type
-            if params['study_type'] in study_type_mapping:
-                study_fields = study_type_mapping[params['study_type']]
-                fields.extend(study_fields)
+            # Drop any wide forms cached from a previous query
+            self.wide = {}
+            self.wide_ffilled = {}
+            self._pivot_cache = None
+
+            # Nothing to query when no stocks are selected
+            if not params.get('selected_stocks'):
+                return pd.DataFrame()
+
+            # Collect required fields based on study type, deduplicated by the set
+            field_set = set(self._STUDY_FIELDS.get(params['study_type'], ()))
                     
             # Add any specific metric if provided
-            if 'metric' in params:
-                if isinstance(params['metric'], list):
-                    fields.extend(params['metric'])
-                else:
-                    fields.append(params['metric'])
+            metric = params.get('metric')
+            if isinstance(metric, list):
+                field_set.update(metric)
+            elif metric:
+                field_set.add(metric)
                     
-            if 'metrics' in params:
-                fields.extend(params['metrics'])
+            field_set.update(params.get('metrics', []))
 
-            # Remove any duplicates while preserving order
-            fields = list(dict.fromkeys(fields))
+            # Always include date, and market_value for distribution charts, then the
+            # remaining fields in sorted order so the query is deterministic
+            fields = ['date', 'market_value'] + sorted(field_set - {'date', 'market_value'})
             
+            # Resolve selected symbols to stock ids so all stocks are fetched in one query
+            # using the portfolio's symbol-keyed stock dict directly
+            stock_map = self.current_portfolio.stocks
+            id_to_symbol = {}
+            for yahoo_symbol in params['selected_stocks']:
+                stock = stock_map.get(yahoo_symbol)
+                if stock:
+                    id_to_symbol[stock.id] = yahoo_symbol
+
+            if not id_to_symbol:
+                return pd.DataFrame()
+
+            # Serve repeated requests (e.g. redraws with unchanged selections) from the LRU cache.
+            # The connection's running write count is part of the key, so any metrics update
+            # made elsewhere in the app (imports, verification, price refreshes) misses the cache
+            cache_key = (
+                self.db_manager.conn.total_changes,
+                self.current_portfolio.id,
+                tuple(fields),
+                tuple(id_to_symbol.items()),
+                params['start_date'],
+                params['end_date']
+            )
+            if cache_key in self._data_cache:
+                self._data_cache.move_to_end(cache_key)
+                df, self.wide, self.wide_ffilled = self._data_cache[cache_key]
+                return df
+
+            # Named placeholders (:id0, :id1, ...) for the IN clause
+            query_params = {
+                'start_date': params['start_date'],
+                'end_date': params['end_date']
+            }
+            placeholders = []
+            for i, stock_id in enumerate(id_to_symbol):
+                query_params[f'id{i}'] = stock_id
+                placeholders.append(f':id{i}')
+
             # Build query using the ordered fields
             query = f"""
-                    SELECT {', '.join(fields)}
+                    SELECT stock_id, {', '.join(fields)}
                     FROM final_metrics
-                    WHERE stock_id = :stock_id 
+                    WHERE stock_id IN ({', '.join(placeholders)})
                     AND date BETWEEN :start_date AND :end_date
                     ORDER BY date
                 """
-            logger.debug(f"Generated SQL query: {query}")
-            logger.debug(f"Fields being queried: {fields}")  # Added debug logging
-            
-            # Get data for selected stocks
-            data_frames = []
-            for yahoo_symbol in params['selected_stocks']:
-                stock = self.current_portfolio.get_stock(yahoo_symbol)
-                if stock:
-                    query_params = {
-                        'stock_id': stock.id,
-                        'start_date': params['start_date'],
-                        'end_date': params['end_date']
-                    }
-                    
-                    logger.debug(f"Executing query for stock {yahoo_symbol} with params: {query_params}")
-                    results = self.db_manager.fetch_all_with_params(query, query_params)
-                    
-                    if results:
-                        df = pd.DataFrame(results, columns=fields)
-                        df['stock'] = yahoo_symbol
-                        data_frames.append(df)
-            
-            if data_frames:
-                return pd.concat(data_frames, ignore_index=True)
-            return pd.DataFrame()
+            # Only format the debug messages when debug logging is enabled
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Generated SQL query: {query}")
+                logger.debug(f"Fields being queried: {fields}")  # Added debug logging
+                logger.debug(f"Executing query with params: {query_params}")
+
+            results = self.db_manager.fetch_all_with_params(query, query_params)
+            if not results:
+                return pd.DataFrame()
+
+            # Transpose the row tuples into typed column arrays; the dict-of-arrays
+            # constructor avoids per-cell type inference on the row tuples
+            columns = list(zip(*results))
+            stock_ids = pd.Series(np.asarray(columns[0], dtype=np.int64))
+            data = {}
+            for field, values in zip(fields, columns[1:]):
+                if field == 'date':
+                    # Parse dates once here; an explicit format with caching skips dateutil inference
+                    data[field] = pd.to_datetime(values, format='%Y-%m-%d', cache=True)
+                else:
+                    data[field] = np.asarray(values, dtype=np.float64)
+            data['stock'] = stock_ids.map(id_to_symbol)
+            df = pd.DataFrame(data)
+
+            # Cache a wide (date x stock) frame per metric so plots don't re-pivot.
+            # A single pivot over all metrics reshapes once instead of once per metric.
+            metrics = [field for field in fields if field != 'date']
+            pivoted = df.pivot(index='date', columns='stock', values=metrics)
+            self.wide = {metric: pivoted[metric] for metric in metrics}
+
+            self._data_cache[cache_key] = (df, self.wide, self.wide_ffilled)
+            if len(self._data_cache) > self.DATA_CACHE_SIZE:
+                self._data_cache.popitem(last=False)
+            return df
             
         except Exception as e:
             logger.error(f"Error getting portfolio data: {str(e)}")
             logger.error(f"Parameters received: {params}")
             raise
 
-    def calculate_portfolio_total_metrics(self, data, params):
-        """Calculate portfolio-wide metrics."""
+    def get_filled_wide(self, metric):
+        """
+        Get the wide form of a metric resampled to daily frequency and forward filled.
+        Each metric is filled once per fetch and reused by every plot that needs it.
+        
+        Args:
+            metric: Name of the metric column
+            
+        Returns:
+            pd.DataFrame: Daily date x stock frame with non-trading days forward filled
+        """
+        if metric not in self.wide_ffilled:
+            self.wide_ffilled[metric] = self.wide[metric].asfreq('D').ffill()
+        return self.wide_ffilled[metric]
+
+    def set_data(self, data):
+        """
+        Replace the data being analysed, kept sorted by date. A result served from the
+        data cache is the same object as before, so statistics built from it remain valid.
+        """
+        if data is self._data_source:
+            return
+        self._data_source = data
+        
+        # The query already orders by date, so this normally just confirms the order
+        if 'date' in data and not data['date'].is_monotonic_increasing:
+            data = data.sort_values('date', kind='mergesort').reset_index(drop=True)
+        self.data = data
+        self._dates = data['date'].to_numpy() if 'date' in data else np.array([], dtype='datetime64[ns]')
+        self._data_version += 1
+        self._stats_cache.clear()
+        self._views.clear()
+
+    def _column_view(self, column):
+        """Return a metric column of the current data as a NumPy array, bound on first use."""
+        view = self._views.get(column)
+        if view is None:
+            view = self._views[column] = self.data[column].to_numpy()
+        return view
+
+    def get_market_value_pivot(self):
+        """
+        Get the forward-filled daily market values as plain arrays, built once per fetch
+        and shared by the distribution slider.
+        
+        Returns:
+            tuple: (values[n_dates, n_stocks], stock symbols, DatetimeIndex of dates)
+        """
+        if self._pivot_cache is None:
+            plot_data = self.get_filled_wide('market_value')
+            self._pivot_cache = (
+                plot_data.to_numpy(dtype=np.float64, copy=True),
+                plot_data.columns.to_numpy(),
+                plot_data.index
+            )
+        return self._pivot_cache
+
+    def calculate_portfolio_total_metrics(self, params):
+        """
+        Calculate portfolio-wide metrics for the last fetched data.
+        Reads the cached wide forms built by get_portfolio_data, so it must be
+        called after the data for the current study has been fetched.
+        """
+        # Row sums over the cached wide forms replace grouping the long-form data by date
         if params['chart_type'] == 'dollar_value':
             # Simple sum for dollar values
-            return data.groupby('date')['total_return'].sum().reset_index()
+            return self.wide['total_return'].sum(axis=1).rename('total_return').reset_index()
         else:  # percentage
             # Calculate weighted return
-            grouped = data.groupby('date').agg({
-                'total_return': 'sum',
-                'market_value': 'sum'
+            grouped = pd.DataFrame({
+                'total_return': self.wide['total_return'].sum(axis=1),
+                'market_value': self.wide['market_value'].sum(axis=1)
             }).reset_index()
             grouped['value'] = grouped['total_return'] / grouped['market_value'] * 100
             return grouped
@@ -138,11 +352,9 @@ class PortfolioStudyController:
     def calculate_deltas(self, data, params):
         """Calculate day-over-day changes."""
         if params['view_type'] == 'individual_stocks':
-            # Calculate deltas for each stock
-            for stock in data['stock'].unique():
-                mask = data['stock'] == stock
-                base_col = params['metric'].replace('_delta', '')
-                data.loc[mask, 'value'] = data.loc[mask, base_col].diff()
+            # Calculate deltas for each stock in a single grouped pass
+            base_col = params['metric'].replace('_delta', '')
+            data['value'] = data.groupby('stock', sort=False)[base_col].diff()
         else:
             # Calculate deltas for portfolio total
             data['value'] = data['value'].diff()
@@ -161,8 +373,12 @@ class PortfolioStudyController:
             # Clean up any existing distribution widgets before proceeding
             self.cleanup_distribution_widgets()
 
+            # A manual update should always reflect the latest metrics in the database
+            if self.view.manual_update:
+                self.clear_data_cache()
+
             # Get data based on study type
-            self.data = self.get_portfolio_data(params)
+            self.set_data(self.get_portfolio_data(params))
             
             if self.data.empty:
                 QMessageBox.warning(
@@ -172,9 +388,17 @@ class PortfolioStudyController:
                 )
                 return
             
-            # Update plot based on study type
-            self.view.figure.clear()
-            ax = self.view.figure.add_subplot(111)
+            # Update plot based on study type, reusing the existing axes when it is still
+            # on the figure (the view may have cleared the figure since the last plot)
+            if self._ax is None or self._ax not in self.view.figure.axes:
+                self.view.figure.clear()
+                self._ax = self.view.figure.add_subplot(111)
+            else:
+                # cla() keeps the equal aspect and hidden frame the distribution pie sets
+                self._ax.cla()
+                self._ax.set_aspect('auto')
+                self._ax.set_frame_on(True)
+            ax = self._ax
             
             study_type = params['study_type']
             
@@ -190,8 +414,7 @@ class PortfolioStudyController:
             # Update statistics
             self.update_statistics_table(params)
             
-            # Refresh canvases
-            self.view.figure.tight_layout()
+            # Refresh canvases (the figure's constrained layout positions the axes when drawn)
             self.view.canvas.draw()
             
         except Exception as e:
@@ -202,28 +425,35 @@ class PortfolioStudyController:
                 f"Failed to analyse portfolio: {str(e)}"
             )
 
-    def setup_date_axis(self, ax):
+    def plot_stock_lines(self, ax, dates, values, labels):
         """
-        Configure date axis formatting and ticks.
+        Plot one line per stock as a single LineCollection artist.
         
         Args:
-            ax: The matplotlib axis to configure
+            ax: matplotlib axis object for plotting
+            dates: List of date arrays, one per stock
+            values: List of value arrays matching dates
+            labels: List of stock labels, one per line
+            
+        Returns:
+            LineCollection: The collection holding all stock lines
         """
-        from matplotlib.dates import AutoDateLocator
-        import matplotlib.dates as mdates
+        colors = [prop['color'] for prop, _ in zip(cycle(plt.rcParams['axes.prop_cycle']), labels)]
+        segments = [
+            np.column_stack([mdates.date2num(x), np.asarray(y, dtype=float)])
+            for x, y in zip(dates, values)
+        ]
         
-        # Create locator and formatter for smart date tick handling
-        locator = AutoDateLocator(minticks=3, maxticks=7)
-        formatter = mdates.ConciseDateFormatter(locator)
+        collection = LineCollection(segments, colors=colors, linewidths=1.5, alpha=0.7)
+        ax.add_collection(collection)
+        ax.xaxis_date()
+        ax.autoscale_view()
         
-        ax.xaxis.set_major_locator(locator)
-        ax.xaxis.set_major_formatter(formatter)
+        # Empty proxy lines provide the per-stock legend entries
+        for color, label in zip(colors, labels):
+            ax.plot([], [], color=color, label=label, linewidth=1.5, alpha=0.7)
         
-        # Rotate labels
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
-        
-        # Adjust the subplot parameters for the current figure
-        plt.gcf().tight_layout()
+        return collection
 
     def plot_market_value(self, ax, params):
         """
@@ -237,18 +467,8 @@ class PortfolioStudyController:
         # Add debug logging
         logger.debug(f"Market Value plot parameters: {params}")
         
-        # Create a copy of the data to avoid modifying the original
-        plot_data = self.data.copy()
-        
-        # Convert date column to datetime if not already
-        plot_data['date'] = pd.to_datetime(plot_data['date'])
-        
-        # Set multi-index using both date and stock
-        plot_data.set_index(['date', 'stock'], inplace=True)
-        
-        # Unstack to get stock as columns, then resample to daily frequency and forward fill
-        plot_data = plot_data['market_value'].unstack()
-        plot_data = plot_data.asfreq('D').ffill()
+        # Use the cached wide form (stocks as columns), resampled to daily frequency and forward filled
+        plot_data = self.get_filled_wide('market_value')
         
         # Create a list to store the lines and labels
         lines = []
@@ -257,19 +477,16 @@ class PortfolioStudyController:
         # Check view type using the correct mapped value
         if params['view_type'] == "individual_stocks":
             # Plot individual stock values
-            for stock in params['selected_stocks']:
-                if stock in plot_data.columns:
-                    line = ax.plot(plot_data.index, plot_data[stock], 
-                        label=stock, linewidth=1.5, alpha=0.7)[0]  # Get the Line2D object
-                    lines.append(line)
-                    labels.append(stock)
+            labels = [stock for stock in params['selected_stocks'] if stock in plot_data.columns]
+            lines.append(self.plot_stock_lines(
+                ax, [plot_data.index] * len(labels), [plot_data[stock] for stock in labels], labels))
                         
         else:  # Portfolio Total
             # Check chart type using the correct mapped value
             if params['chart_type'] == "line_chart":
                 # Sum market values by date using the forward-filled values
                 portfolio_total = plot_data.sum(axis=1)
-                line = ax.plot(plot_data.index, portfolio_total.values,
+                line = ax.plot(plot_data.index, np.asarray(portfolio_total, dtype=np.float32),
                     label='Total Portfolio', linewidth=2, alpha=0.7)[0]
                 lines.append(line)
                 labels.append('Total Portfolio')
@@ -281,9 +498,10 @@ class PortfolioStudyController:
                 sorted_columns = sorted(plot_data.columns)
                 plot_data = plot_data[sorted_columns]
                 
-                # Create the stacked area plot
+                # Create the stacked area plot from the (stocks x dates) transposed array,
+                # narrowed to float32 for rendering; self.wide stays float64 for the statistics
                 ax.stackplot(plot_data.index, 
-                            [plot_data[col] for col in plot_data.columns],
+                            plot_data.to_numpy(dtype=np.float32).T,
                             labels=plot_data.columns,
                             alpha=0.8)
             
@@ -324,9 +542,6 @@ class PortfolioStudyController:
             chart_type = params['chart_type']
             zero_at_start = params.get('zero_at_start', False)
             
-            # Convert dates to datetime if they aren't already
-            self.data['date'] = pd.to_datetime(self.data['date'])
-            
             # Determine which metric to use
             if chart_type == 'dollar_value':
                 metric = 'daily_pl' if time_period == 'daily' else 'total_return'
@@ -346,8 +561,11 @@ class PortfolioStudyController:
             labels = []
             
             if view_type == 'individual_stocks':
+                dates = []
+                values = []
                 for stock in params['selected_stocks']:
-                    stock_data = self.data[self.data['stock'] == stock].copy()
+                    # Read-only slice; zeroing below produces a new Series
+                    stock_data = self.data[self.data['stock'] == stock]
                     y_values = stock_data[metric]
                     
                     # Zero at start date if requested
@@ -355,33 +573,26 @@ class PortfolioStudyController:
                         start_value = y_values.iloc[0]
                         y_values = y_values - start_value
                         
-                    line = ax.plot(stock_data['date'], y_values, label=stock, linewidth=1.5, alpha=0.7)[0]
-                    lines.append(line)
+                    dates.append(stock_data['date'].to_numpy())
+                    values.append(y_values)
                     labels.append(stock)
+                
+                lines.append(self.plot_stock_lines(ax, dates, values, labels))
 
             else:  # portfolio_total
                 if time_period == 'cumulative' and chart_type == 'dollar_value':
-                    # Create a copy of the data to avoid modifying original
-                    plot_data = self.data.copy()
-                    
-                    # Set multi-index using date and stock
-                    plot_data.set_index(['date', 'stock'], inplace=True)
+                    # Use the cached wide form resampled to daily frequency and forward filled
+                    plot_data = self.get_filled_wide(metric)
                     
-                    # Unstack to get stock as columns
-                    plot_data = plot_data[metric].unstack()
-                    
-                    # Resample to daily frequency and forward fill
-                    plot_data = plot_data.asfreq('D').ffill()
-                    
-                    # Calculate portfolio total using the forward-filled values
-                    y_values = plot_data.sum(axis=1)
+                    # Calculate portfolio total using the forward-filled values (NaN-skipping row sum)
+                    y_values = pd.Series(np.nansum(plot_data.to_numpy(), axis=1), index=plot_data.index)
                     
                     # Zero at start date if requested
                     if zero_at_start:
                         start_value = y_values.iloc[0]
                         y_values = y_values - start_value
                     
-                    line = ax.plot(y_values.index, y_values.values, label='Portfolio Total', 
+                    line = ax.plot(y_values.index, np.asarray(y_values, dtype=np.float32), label='Portfolio Total', 
                                 linewidth=2, alpha=0.7)[0]
                     lines.append(line)
                     labels.append('Portfolio Total')
@@ -390,28 +601,20 @@ class PortfolioStudyController:
                 elif chart_type == 'percentage':
                     if time_period == 'daily':
                         # For daily changes, sum daily_pl and express as % of total portfolio value
-                        grouped = self.data.groupby('date').agg({
-                            'daily_pl': 'sum',
-                            'market_value': 'sum'
-                        })
-                        y_values = (grouped['daily_pl'] / grouped['market_value']) * 100
+                        y_values = (self.wide['daily_pl'].sum(axis=1) /
+                                    self.wide['market_value'].sum(axis=1)) * 100
                     else:  # cumulative
                         # Handle weekend data for cumulative percentage return
-                        plot_data = self.data.copy()
-                        plot_data.set_index(['date', 'stock'], inplace=True)
-                        
-                        # Get required columns and unstack
-                        total_return_data = plot_data['total_return'].unstack()
-                        market_value_data = plot_data['market_value'].unstack()
-                        
-                        # Resample and forward fill both
-                        total_return_data = total_return_data.asfreq('D').ffill()
-                        market_value_data = market_value_data.asfreq('D').ffill()
+                        # Use the resampled and forward filled cached wide forms
+                        total_return_data = self.get_filled_wide('total_return')
+                        market_value_data = self.get_filled_wide('market_value')
                         
-                        # Calculate portfolio percentage return
-                        portfolio_total_return = total_return_data.sum(axis=1)
-                        portfolio_total_value = market_value_data.sum(axis=1)
-                        y_values = (portfolio_total_return / portfolio_total_value) * 100
+                        # Calculate portfolio percentage return on the raw arrays in one expression,
+                        # wrapping only the final result back into a Series
+                        with np.errstate(divide='ignore', invalid='ignore'):
+                            portfolio_return_pct = (np.nansum(total_return_data.to_numpy(), axis=1) /
+                                                    np.nansum(market_value_data.to_numpy(), axis=1)) * 100
+                        y_values = pd.Series(portfolio_return_pct, index=total_return_data.index)
                         
                     # Zero at start date if requested
                     if zero_at_start and time_period == 'cumulative':
@@ -419,7 +622,7 @@ class PortfolioStudyController:
                         y_values = y_values - start_value
                         
                     # Use y_values.index instead of grouped.index
-                    line = ax.plot(y_values.index, y_values.values, label='Portfolio Total', 
+                    line = ax.plot(y_values.index, np.asarray(y_values, dtype=np.float32), label='Portfolio Total', 
                                 linewidth=2, alpha=0.7)[0]
                     lines.append(line)
                     labels.append('Portfolio Total')
@@ -431,10 +634,8 @@ class PortfolioStudyController:
             if zero_at_start and time_period == 'cumulative':
                 ylabel = f"Change in {ylabel} from Start Date"
                 
-            # Set axis limits based on actual data range
-            min_date = self.data['date'].min()
-            max_date = self.data['date'].max()
-            ax.set_xlim(min_date, max_date)
+            # Set axis limits based on actual data range (the data is sorted by date)
+            ax.set_xlim(self._dates[0], self._dates[-1])
             
             period_type = 'Daily' if time_period == 'daily' else 'Cumulative'
             ax.set_title(f"Portfolio {period_type} Returns" + 
@@ -477,20 +678,17 @@ class PortfolioStudyController:
         try:
             logger.debug(f"Plotting dividends with parameters: {params}")
             
-            # Create a copy of the data to avoid modifying original
-            plot_data = self.data.copy()
+            # Start from the cached wide forms (stocks as columns)
+            wide = dict(self.wide)
             
-            # Convert date column to datetime if not already
-            plot_data['date'] = pd.to_datetime(plot_data['date'])
-            
-            # Calculate DRP value in dollars before setting index
+            # Calculate DRP value in dollars from the wide forms
             if params['chart_type'] in ['drp', 'combined']:
-                # Convert DRP shares to dollar values using closing price
-                plot_data['drp_value'] = plot_data['drp_share'] * plot_data['close_price']
-                plot_data['drp_value_total'] = plot_data['drp_shares_total'] * plot_data['close_price']
-            
-            # Set multi-index using both date and stock
-            plot_data.set_index(['date', 'stock'], inplace=True)
+                # Convert DRP shares to dollar values using closing price; all wide forms
+                # share the same date index and stock columns, so multiply the raw arrays
+                close_price = wide['close_price']
+                for column, shares in (('drp_value', 'drp_share'), ('drp_value_total', 'drp_shares_total')):
+                    wide[column] = pd.DataFrame(wide[shares].to_numpy() * close_price.to_numpy(),
+                                                index=close_price.index, columns=close_price.columns)
             
             # Create lists to store lines and labels
             lines = []
@@ -500,25 +698,25 @@ class PortfolioStudyController:
             if params['chart_type'] == 'cash':
                 # For cash dividends, use appropriate metric based on time period
                 metric = 'cash_dividends_total' if params['time_period'] == 'cumulative' else 'cash_dividend'
-                plot_data = plot_data[metric].unstack()
+                plot_data = wide[metric]
                 ylabel = "Cash Dividend Value ($)"
                 value_format = lambda x, p: f'${x:,.2f}'
                 
             elif params['chart_type'] == 'drp':
                 # For DRP, use calculated dollar values instead of share counts
                 metric = 'drp_value_total' if params['time_period'] == 'cumulative' else 'drp_value'
-                plot_data = plot_data[metric].unstack()
+                plot_data = wide[metric]
                 ylabel = "DRP Value ($)"
                 value_format = lambda x, p: f'${x:,.2f}'
                 
             else:  # combined view
                 # Get both cash and DRP data
                 if params['time_period'] == 'cumulative':
-                    cash_data = plot_data['cash_dividends_total'].unstack()
-                    drp_data = plot_data['drp_value_total'].unstack()
+                    cash_data = wide['cash_dividends_total']
+                    drp_data = wide['drp_value_total']
                 else:
-                    cash_data = plot_data['cash_dividend'].unstack()
-                    drp_data = plot_data['drp_value'].unstack()
+                    cash_data = wide['cash_dividend']
+                    drp_data = wide['drp_value']
                 
                 # Combine cash and DRP values into total dividend value
                 total_dividend_data = cash_data.fillna(0) + drp_data.fillna(0)
@@ -529,6 +727,8 @@ class PortfolioStudyController:
             if params['time_period'] == 'cumulative':
                 if params['chart_type'] == 'combined':
                     total_dividend_data = total_dividend_data.asfreq('D').ffill()
+                elif metric in self.wide:
+                    plot_data = self.get_filled_wide(metric)
                 else:
                     plot_data = plot_data.asfreq('D').ffill()
 
@@ -536,31 +736,27 @@ class PortfolioStudyController:
             if params['view_type'] == 'individual_stocks':
                 if params['chart_type'] == 'combined':
                     # Plot total dividend value for each stock
-                    for stock in total_dividend_data.columns:
-                        line = ax.plot(total_dividend_data.index, total_dividend_data[stock],
-                            label=stock, linewidth=1.5, alpha=0.7)[0]
-                        lines.append(line)
-                        labels.append(stock)
+                    stock_data = total_dividend_data
                 else:
                     # Plot individual metric for each stock
-                    for stock in plot_data.columns:
-                        line = ax.plot(plot_data.index, plot_data[stock],
-                            label=stock, linewidth=1.5, alpha=0.7)[0]
-                        lines.append(line)
-                        labels.append(stock)
+                    stock_data = plot_data
+                
+                labels = list(stock_data.columns)
+                lines.append(self.plot_stock_lines(
+                    ax, [stock_data.index] * len(labels), [stock_data[stock] for stock in labels], labels))
                         
             else:  # portfolio_total
                 if params['chart_type'] == 'combined':
                     # Calculate and plot portfolio total dividend value
                     portfolio_total = total_dividend_data.sum(axis=1)
-                    line = ax.plot(portfolio_total.index, portfolio_total.values,
+                    line = ax.plot(portfolio_total.index, np.asarray(portfolio_total, dtype=np.float32),
                         label='Total Dividends', linewidth=2, alpha=0.7)[0]
                     lines.append(line)
                     labels.append('Total Dividends')
                 else:
                     # Calculate and plot portfolio total for single metric
                     portfolio_total = plot_data.sum(axis=1)
-                    line = ax.plot(portfolio_total.index, portfolio_total.values,
+                    line = ax.plot(portfolio_total.index, np.asarray(portfolio_total, dtype=np.float32),
                         label='Portfolio Total', linewidth=2, alpha=0.7)[0]
                     lines.append(line)
                     labels.append('Portfolio Total')
@@ -586,9 +782,6 @@ class PortfolioStudyController:
             # Add legend with proper positioning
             ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
             
-            # Adjust layout to prevent label cutoff
-            plt.tight_layout()
-            
             # Set up line picking
             self.view.setup_line_picking(lines, labels)
             
@@ -607,33 +800,17 @@ class PortfolioStudyController:
             ax: matplotlib axis object for the pie chart
         """
         try:
-            # Convert dates to datetime if needed
-            self.data['date'] = pd.to_datetime(self.data['date'])
-
-            # Create a copy of the data to avoid modifying original
-            plot_data = self.data.copy()
-            
-            # Set multi-index using date and stock, then unstack
-            plot_data.set_index(['date', 'stock'], inplace=True)
-            plot_data = plot_data['market_value'].unstack()
-            
-            # Resample to daily frequency and forward fill missing values
-            plot_data = plot_data.asfreq('D').ffill()
-            
-            # Get all unique dates after forward filling
-            unique_dates = sorted(plot_data.index)
+            # Use the cached market value pivot (dates x stocks), resampled to daily
+            # frequency with missing values forward filled; the resample keeps dates sorted
+            values, stocks_array, unique_dates = self.get_market_value_pivot()
             
             if len(unique_dates) == 0:
                 ax.text(0.5, 0.5, 'No data available for selected date range',
                     ha='center', va='center')
                 return
             
-            # Find the charts tab and its layout
-            charts_tab = None
-            for i in range(self.view.findChild(QTabWidget).count()):
-                if self.view.findChild(QTabWidget).tabText(i) == "Charts":
-                    charts_tab = self.view.findChild(QTabWidget).widget(i)
-                    break
+            # Use the charts tab found in set_view
+            charts_tab = self._charts_tab
             
             if not charts_tab:
                 logger.error("Could not find Charts tab")
@@ -676,48 +853,163 @@ class PortfolioStudyController:
             # Add the date container to the charts tab layout
             charts_tab.layout().addWidget(date_container)
             
+            # Precompute the date labels and daily portfolio totals so a slider tick
+            # only reads plain arrays
+            date_labels = unique_dates.strftime('%Y-%m-%d').tolist()
+            totals = np.nansum(values, axis=1)
+            
+            # Build one wedge and pair of labels per stock up front, keyed by symbol. Updates
+            # only reshape, move and show or hide them, so the pie is never rebuilt
+            self.clear_pie_artists()
+            self._last_pos = -1
+            
+            all_stocks = stocks_array.tolist()
+            colors = np.array([prop['color'] for prop, _ in zip(cycle(plt.rcParams['axes.prop_cycle']), all_stocks)])
+            self._pie_wedges = {stock: Wedge((0, 0), 1, 90, 90) for stock in all_stocks}
+            self._pie_collection = PatchCollection([], edgecolor='white', linewidth=1, clip_on=False)
+            ax.add_collection(self._pie_collection)
+            self._pie_texts = {
+                stock: ax.text(0, 0, '', fontsize=8, va='center', clip_on=False, visible=False)
+                for stock in all_stocks
+            }
+            self._pie_autotexts = {
+                stock: ax.text(0, 0, '', color='white', fontsize=8, weight='bold',
+                               ha='center', va='center', clip_on=False, visible=False)
+                for stock in all_stocks
+            }
+            empty_text = ax.text(0.5, 0.5, 'No positive market values to display',
+                ha='center', va='center', transform=ax.transAxes, visible=False)
+            
+            # Same frame ax.pie sets up
+            ax.set(aspect='equal', frame_on=False, xticks=[], yticks=[],
+                   xlim=(-1.25, 1.25), ylim=(-1.25, 1.25))
+            
+            # Figure background without the pie artists, used to blit updates
+            canvas = self.view.canvas
+            figure = self.view.figure
+            blit = {'background': None, 'capturing': False}
+            
+            def pie_artists():
+                return [self._pie_collection, *self._pie_texts.values(),
+                        *self._pie_autotexts.values(), empty_text, ax.title]
+            
+            def invalidate_background(event):
+                # Any other full redraw (resize, layout) makes the background stale
+                if not blit['capturing']:
+                    blit['background'] = None
+            
+            def capture_background():
+                # Render the figure once with the pie artists hidden and keep the pixels
+                artists = pie_artists()
+                visible = [artist.get_visible() for artist in artists]
+                
+                # Pause the constrained layout so hiding the pie and title does not
+                # enlarge the axes in the background the slider frames are blitted onto
+                layout_engine = figure.get_layout_engine()
+                figure.set_layout_engine('none')
+                
+                # Drawing the axes with its title hidden moves the title off the canvas,
+                # so keep the position from the last full draw for the blitted frames
+                title_position = ax.title.get_position()
+                blit['capturing'] = True
+                try:
+                    for artist in artists:
+                        artist.set_visible(False)
+                    canvas.draw()
+                    blit['background'] = canvas.copy_from_bbox(figure.bbox)
+                finally:
+                    for artist, was_visible in zip(artists, visible):
+                        artist.set_visible(was_visible)
+                    ax.title.set_position(title_position)
+                    figure.set_layout_engine(layout_engine)
+                    blit['capturing'] = False
+            
+            self._draw_cid = canvas.mpl_connect('draw_event', invalidate_background)
+            
             def update_distribution(position):
                 """Update the pie chart for the selected date position."""
-                ax.clear()
+                # Nothing to do if this position is already on screen
+                if position == self._last_pos:
+                    return
                 
-                # Get current date
-                current_date = unique_dates[position]
+                # Get the forward-filled row for the current date
+                row = values[position]
                 
-                # Get data for current date from the forward-filled dataset
-                current_data = plot_data.loc[current_date]
+                # Show the precomputed total portfolio value
+                total_value_label.setText(f"Total Portfolio Value: ${totals[position]:,.2f}")
                 
-                # Calculate total portfolio value
-                total_portfolio_value = current_data.sum()
-                total_value_label.setText(f"Total Portfolio Value: ${total_portfolio_value:,.2f}")
+                # Filter out zero (and missing) values
+                positive_mask = row > 0
+                positive_sizes = row[positive_mask]
                 
-                # Filter out zero values
-                positive_sizes = current_data[current_data > 0]
+                # Only stocks with a positive value get a visible slice
+                for stock, visible in zip(all_stocks, positive_mask.tolist()):
+                    self._pie_texts[stock].set_visible(visible)
+                    self._pie_autotexts[stock].set_visible(visible)
                 
-                if not positive_sizes.empty:
-                    # Create labels with stock name and value
-                    labels = [f"{stock}\n(${value:,.0f})" for stock, value in positive_sizes.items()]
+                if positive_sizes.size:
+                    # Create labels with stock name and value, converting to native
+                    # Python values once rather than formatting NumPy scalars
+                    stocks = stocks_array[positive_mask].tolist()
+                    labels = [f"{stock}\n(${value:,.0f})" for stock, value in zip(stocks, positive_sizes.tolist())]
+                    
+                    fracs, angles, xs, ys = _pie_geometry(positive_sizes)
                     
-                    # Create pie chart
-                    wedges, texts, autotexts = ax.pie(
-                        positive_sizes,
-                        labels=labels,
-                        autopct='%1.1f%%',
-                        pctdistance=0.85,
-                        startangle=90,
-                        wedgeprops={'edgecolor': 'white', 'linewidth': 1}
-                    )
+                    for stock, label, frac, theta1, theta2, x, y in zip(
+                            stocks, labels, fracs.tolist(), angles[:-1].tolist(),
+                            angles[1:].tolist(), xs.tolist(), ys.tolist()):
+                        self._pie_wedges[stock].set_theta1(theta1)
+                        self._pie_wedges[stock].set_theta2(theta2)
+                        
+                        # Place labels on the wedge midpoint as ax.pie does
+                        text = self._pie_texts[stock]
+                        text.set_position((1.1 * x, 1.1 * y))
+                        text.set_horizontalalignment('left' if x > 0 else 'right')
+                        text.set_text(label)
+                        autotext = self._pie_autotexts[stock]
+                        autotext.set_position((0.85 * x, 0.85 * y))
+                        autotext.set_text(f"{frac * 100:.1f}%")
                     
-                    ax.set_title(f"Portfolio Distribution on {current_date.strftime('%Y-%m-%d')}")
-                    plt.setp(autotexts, color='white', fontsize=8, weight='bold')
-                    plt.setp(texts, fontsize=8)
+                    self._pie_collection.set_paths([self._pie_wedges[stock] for stock in stocks])
+                    self._pie_collection.set_facecolor(colors[positive_mask])
+                    empty_text.set_visible(False)
+                    ax.set_title(f"Portfolio Distribution on {date_labels[position]}")
                 else:
-                    ax.text(0.5, 0.5, 'No positive market values to display',
-                        ha='center', va='center')
+                    self._pie_collection.set_paths([])
+                    empty_text.set_visible(True)
+                    ax.set_title('')
+                
+                first_draw = self._last_pos < 0
+                self._last_pos = position
+                if first_draw:
+                    # The first frame is drawn with the rest of the figure
+                    canvas.draw_idle()
+                    return
                 
-                self.view.canvas.draw()
+                # Blit only the pie artists over the cached background
+                # instead of re-rendering the whole figure
+                if blit['background'] is None:
+                    capture_background()
+                canvas.restore_region(blit['background'])
+                for artist in pie_artists():
+                    figure.draw_artist(artist)
+                canvas.blit(figure.bbox)
+            
+            # Redraw the pie once the slider settles rather than on every step of a drag,
+            # keeping only the total value label in sync with each movement
+            self._pending_pos = 0
+            self._redraw_timer = QTimer(date_container)
+            self._redraw_timer.setSingleShot(True)
+            self._redraw_timer.setInterval(self.SLIDER_REDRAW_DELAY)
+            self._redraw_timer.timeout.connect(lambda: update_distribution(self._pending_pos))
+            
+            def on_slider_moved(position):
+                self._pending_pos = position
+                total_value_label.setText(f"Total Portfolio Value: ${totals[position]:,.2f}")
+                self._redraw_timer.start()
             
             # Connect slider to update function
-            time_slider.valueChanged.connect(update_distribution)
+            time_slider.valueChanged.connect(on_slider_moved)
             
             # Initial plot
             update_distribution(0)
@@ -732,11 +1024,29 @@ class PortfolioStudyController:
                 ha='center', va='center')
             raise
 
+    def clear_pie_artists(self):
+        """Forget the cached distribution pie artists."""
+        self._pie_wedges = {}
+        self._pie_texts = {}
+        self._pie_autotexts = {}
+        self._pie_collection = None
+
     def cleanup_distribution_widgets(self):
         """Remove the time slider and date label when switching views or closing."""
+        # Stop any pending slider redraw before its widgets go away
+        if self._redraw_timer is not None:
+            self._redraw_timer.stop()
+            self._redraw_timer = None
+        
         if hasattr(self, 'date_container'):
             self.date_container.deleteLater()
             delattr(self, 'date_container')
+        
+        # Stop tracking redraws for the distribution slider's blit background
+        if self._draw_cid is not None:
+            self.view.canvas.mpl_disconnect(self._draw_cid)
+            self._draw_cid = None
+        self.clear_pie_artists()
 
     def setup_date_axis(self, ax):
         """
@@ -745,24 +1055,18 @@ class PortfolioStudyController:
         Args:
             ax: The matplotlib axis to configure
         """
-        from matplotlib.dates import AutoDateLocator
-        import matplotlib.dates as mdates
-        
         # Create locator and formatter for smart date tick handling
-        locator = AutoDateLocator(minticks=3, maxticks=7)
+        locator = mdates.AutoDateLocator(minticks=3, maxticks=7)
         formatter = mdates.ConciseDateFormatter(locator)
         
         ax.xaxis.set_major_locator(locator)
         ax.xaxis.set_major_formatter(formatter)
         
-        # Rotate labels for better readability
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
-        
-        # Get current figure
-        fig = plt.gcf()
-        
-        # Use a tight layout to prevent label cutoff
-        fig.tight_layout()
+        # Rotate labels for better readability, setting them directly on the axis's
+        # own tick labels rather than through pyplot
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
 
     def update_statistics_table(self, params):
         """Update statistics table with current analysis."""
@@ -770,69 +1074,104 @@ class PortfolioStudyController:
         
         # Clear existing stats
         self.view.stats_table.setRowCount(0)
-        stats = {}
-        
-        if study_type == "Market Value":
-            latest_values = self.data.groupby('stock')['market_value'].last()
-            total_value = latest_values.sum()
-            
-            stats.update({
-                'Total Portfolio Value': f"${total_value:,.2f}",
-                'Number of Holdings': str(len(latest_values)),
-                'Largest Holding': f"{latest_values.idxmax()} (${latest_values.max():,.2f})",
-                'Smallest Holding': f"{latest_values.idxmin()} (${latest_values.min():,.2f})"
-            })
-            
-        elif study_type == "Profitability":
-            if params['display_type'] == "Percentage":
-                metric = 'daily_pl_pct' if params['time_period'] == "Daily Changes" else 'total_return_pct'
-                suffix = "%"
-            else:
-                metric = 'daily_pl' if params['time_period'] == "Daily Changes" else 'total_return'
-                suffix = "$"
-            
-            data = self.data[metric]
-            stats.update({
-                'Average Return': f"{data.mean():.2f}{suffix}",
-                'Best Return': f"{data.max():.2f}{suffix}",
-                'Worst Return': f"{data.min():.2f}{suffix}",
-                'Volatility': f"{data.std():.2f}{suffix}"
-            })
-            
-        elif study_type == "Dividend Performance":
-            if params['view_type'] == "Cash Dividends":
-                total_col = 'cash_dividends_total'
-                period_col = 'cash_dividend'
-                prefix = "$"
-            else:
-                total_col = 'drp_shares_total'
-                period_col = 'drp_share'
-                prefix = ""
-            
-            stats.update({
-                'Total Received': f"{prefix}{self.data[total_col].max():.2f}",
-                'Average Per Period': f"{prefix}{self.data[period_col].mean():.2f}",
-                'Largest Single Payment': f"{prefix}{self.data[period_col].max():.2f}",
-                'Number of Payments': str(len(self.data[self.data[period_col] > 0]))
-            })
-            
-        else:  # Portfolio Distribution
-            latest_date = self.data['date'].max()
-            latest_values = self.data[self.data['date'] == latest_date]
-            holdings = latest_values.groupby('stock')['market_value'].sum()
-            
-            stats.update({
-                'Number of Holdings': str(len(holdings)),
-                'Total Portfolio Value': f"${holdings.sum():,.2f}",
-                'Largest Allocation': f"{holdings.idxmax()} ({holdings.max()/holdings.sum()*100:.1f}%)",
-                'Smallest Allocation': f"{holdings.idxmin()} ({holdings.min()/holdings.sum()*100:.1f}%)"
-            })
-        
-        # Update table
-        self.view.stats_table.setRowCount(len(stats))
-        for i, (metric, value) in enumerate(stats.items()):
-            self.view.stats_table.setItem(i, 0, QTableWidgetItem(metric))
-            self.view.stats_table.setItem(i, 1, QTableWidgetItem(str(value)))
+        
+        # Reuse the statistics when the same study is shown again for unchanged data;
+        # the builders only vary with the chart type and time period
+        cache_key = (
+            self._data_version,
+            study_type,
+            params.get('chart_type'),
+            params.get('time_period')
+        )
+        stats = self._stats_cache.get(cache_key)
+        if stats is None:
+            builder = self._stats_builders.get(study_type, self._stats_distribution)
+            stats = self._stats_cache[cache_key] = builder(params)
+        
+        # Update table, suspending repaints and signals so it is laid out once after the fill
+        table = self.view.stats_table
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        try:
+            table.setRowCount(len(stats))
+            for i, (metric, value) in enumerate(stats.items()):
+                table.setItem(i, 0, QTableWidgetItem(metric))
+                table.setItem(i, 1, QTableWidgetItem(str(value)))
+        finally:
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+            table.viewport().update()
+
+    def _stats_market_value(self, params):
+        """Build market value statistics from each stock's latest value."""
+        latest_values = self.data.groupby('stock', sort=False)['market_value'].last()
+        total_value = latest_values.sum()
+        
+        return {
+            'Total Portfolio Value': f"${total_value:,.2f}",
+            'Number of Holdings': str(len(latest_values)),
+            'Largest Holding': f"{latest_values.idxmax()} (${latest_values.max():,.2f})",
+            'Smallest Holding': f"{latest_values.idxmin()} (${latest_values.min():,.2f})"
+        }
+
+    def _stats_profitability(self, params):
+        """Build return statistics for the selected chart type and time period."""
+        daily = params.get('time_period') == 'daily'
+        if params.get('chart_type') in ('percentage', 'aggregated_percentage'):
+            metric = 'daily_pl_pct' if daily else 'total_return_pct'
+            suffix = "%"
+        else:  # dollar_value
+            metric = 'daily_pl' if daily else 'total_return'
+            suffix = "$"
+        
+        # Reduce the raw column directly, skipping missing values as pandas does
+        values = self._column_view(metric)
+        return {
+            'Average Return': f"{np.nanmean(values):.2f}{suffix}",
+            'Best Return': f"{np.nanmax(values):.2f}{suffix}",
+            'Worst Return': f"{np.nanmin(values):.2f}{suffix}",
+            'Volatility': f"{np.nanstd(values, ddof=1):.2f}{suffix}"
+        }
+
+    def _stats_dividends(self, params):
+        """Build dividend statistics for cash dividends, DRP shares or both."""
+        chart_type = params.get('chart_type')
+        if chart_type == 'combined':
+            # Cash + DRP shows both sets of figures, labelled by dividend type
+            stats = {}
+            for name, columns in (('Cash', ('cash_dividends_total', 'cash_dividend', "$")),
+                                  ('DRP', ('drp_shares_total', 'drp_share', ""))):
+                stats.update({f"{name} {label}": value
+                              for label, value in self._dividend_stats(*columns).items()})
+            return stats
+        if chart_type == 'drp':
+            return self._dividend_stats('drp_shares_total', 'drp_share', "")
+        return self._dividend_stats('cash_dividends_total', 'cash_dividend', "$")
+
+    def _dividend_stats(self, total_col, period_col, prefix):
+        """Build the statistics for one dividend type from its cumulative and per-period columns."""
+        # Each stock's running total ends at its latest row, so the portfolio total is their sum
+        total_received = self.data.groupby('stock', sort=False)[total_col].last().sum()
+        period_values = self._column_view(period_col)
+        return {
+            'Total Received': f"{prefix}{total_received:.2f}",
+            'Average Per Period': f"{prefix}{np.nanmean(period_values):.2f}",
+            'Largest Single Payment': f"{prefix}{np.nanmax(period_values):.2f}",
+            'Number of Payments': str(int((period_values > 0).sum()))
+        }
+
+    def _stats_distribution(self, params):
+        """Build allocation statistics for the latest date."""
+        # The last row of the market value pivot holds each stock's value on the latest date
+        holdings = self.wide['market_value'].iloc[-1].dropna()
+        total_value = holdings.sum()
+        
+        return {
+            'Number of Holdings': str(len(holdings)),
+            'Total Portfolio Value': f"${total_value:,.2f}",
+            'Largest Allocation': f"{holdings.idxmax()} ({holdings.max()/total_value*100:.1f}%)",
+            'Smallest Allocation': f"{holdings.idxmin()} ({holdings.min()/total_value*100:.1f}%)"
+        }
 
     def get_active_stocks_for_date_range(self, start_date, end_date, dividend_type=None):
         """
@@ -851,63 +1190,8 @@ class PortfolioStudyController:
             logger.debug(f"Current portfolio ID: {self.current_portfolio.id}")
             logger.debug(f"Dividend type filter: {dividend_type}")
             
-            # Base query for non-dividend analysis
-            base_query = """
-                WITH stock_activity AS (
-                    SELECT 
-                        s.id,
-                        s.yahoo_symbol,
-                        s.name,
-                        COUNT(*) as total_days,
-                        SUM(CASE WHEN fm.market_value > 0 THEN 1 ELSE 0 END) as active_days,
-                        MAX(fm.market_value) as max_value
-                """
-            
-            # Add dividend-specific metrics based on type
-            if dividend_type == 'cash':
-                base_query += """,
-                        SUM(CASE WHEN fm.cash_dividend > 0 THEN 1 ELSE 0 END) as dividend_days
-                """
-            elif dividend_type == 'drp':
-                base_query += """,
-                        SUM(CASE WHEN fm.drp_share > 0 THEN 1 ELSE 0 END) as dividend_days
-                """
-            elif dividend_type == 'combined':
-                base_query += """,
-                        SUM(CASE WHEN fm.cash_dividend > 0 OR fm.drp_share > 0 THEN 1 ELSE 0 END) as dividend_days
-                """
-                
-            # Complete the query
-            query = base_query + """
-                    FROM stocks s
-                    JOIN portfolio_stocks ps ON s.id = ps.stock_id
-                    JOIN final_metrics fm ON s.id = fm.stock_id
-                    WHERE fm.date BETWEEN :start_date AND :end_date
-                    AND ps.portfolio_id = :portfolio_id
-                    GROUP BY s.id, s.yahoo_symbol, s.name
-                )
-                SELECT 
-                    id,
-                    yahoo_symbol,
-                    name,
-                    total_days,
-                    active_days,
-                    max_value
-            """
-            
-            # Add dividend filtering if needed
-            if dividend_type:
-                query += """
-                FROM stock_activity
-                WHERE dividend_days > 0
-                """
-            else:
-                query += """
-                FROM stock_activity
-                WHERE active_days > 0
-                """
-                
-            query += " ORDER BY yahoo_symbol;"
+            # Use the fixed query text built in __init__ so SQLite's statement cache is reused
+            query = self._active_stock_queries.get(dividend_type, self._active_stock_queries[None])
             
             params = {
                 'start_date': start_date,
@@ -916,18 +1200,19 @@ class PortfolioStudyController:
             }
             
             logger.debug(f"Executing query with params: {params}")
-            results = self.db_manager.fetch_all_with_params(query, params)
-            logger.debug(f"Query returned {len(results)} results")
             
-            # Convert results to stock objects
+            # Convert results to stock objects using the portfolio's symbol-keyed stock dict,
+            # streaming the rows in batches rather than materialising the whole result
+            stock_map = self.current_portfolio.stocks
             active_stocks = []
-            for row in results:
-                stock = self.current_portfolio.get_stock(row[1])  # row[1] is yahoo_symbol
-                if stock:
-                    active_stocks.append(stock)
-                    logger.debug(f"Added stock {stock.yahoo_symbol} to active stocks list")
-                else:
-                    logger.warning(f"Stock {row[1]} found in database but not in portfolio")
+            for batch in self.db_manager.fetch_iter_with_params(query, params):
+                for stock_id, yahoo_symbol, *_ in batch:
+                    stock = stock_map.get(yahoo_symbol)
+                    if stock:
+                        active_stocks.append(stock)
+                        logger.debug(f"Added stock {stock.yahoo_symbol} to active stocks list")
+                    else:
+                        logger.warning(f"Stock {yahoo_symbol} found in database but not in portfolio")
             
             logger.debug(f"Returning {len(active_stocks)} active stocks")
             return active_stocks
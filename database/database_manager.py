@@ -485,6 +485,25 @@ class DatabaseManager:
             self.cursor.execute(sql, params)
         return self.cursor.fetchone()
 
+    def fetch_iter_with_params(self, sql, params=None, batch=512):
+        """
+        Yield results with named parameters in batches of rows.
+        Uses its own cursor so other queries can run while the batches are consumed.
+        """
+        cursor = self.conn.cursor()
+        try:
+            if params is None:
+                cursor.execute(sql)
+            else:
+                cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
     def bulk_update_stock_metrics(self, metrics_list):
         """
         Bulk update or insert metrics for multiple records at once.
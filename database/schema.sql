@@ -134,6 +134,8 @@ CREATE INDEX IF NOT EXISTS idx_final_metrics_stock_date
     ON final_metrics(stock_id, date);
 CREATE INDEX IF NOT EXISTS idx_final_metrics_date 
     ON final_metrics(date);
+CREATE INDEX IF NOT EXISTS idx_final_metrics_active_stock_date 
+    ON final_metrics(stock_id, date) WHERE market_value > 0;
 
 -- Create supported currencies table
 CREATE TABLE IF NOT EXISTS supported_currencies (
@@ -8,8 +8,10 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PySide6.QtCore import Signal, Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT
+from matplotlib.collections import LineCollection
 from matplotlib.figure import Figure
 from datetime import datetime
+import numpy as np
 import logging
 import yaml
 
@@ -327,7 +329,9 @@ class PortfolioStudyView(QWidget):
         charts_tab = QWidget()
         charts_layout = QVBoxLayout(charts_tab)
         
-        self.figure = Figure(figsize=(10, 6))
+        # Constrained layout keeps labels and the outside legend from being cut off,
+        # adjusting only when the figure is drawn rather than on every plot update
+        self.figure = Figure(figsize=(10, 6), layout='constrained')
         self.canvas = FigureCanvas(self.figure)
         
         # Add matplotlib toolbar
@@ -707,7 +711,7 @@ class PortfolioStudyView(QWidget):
         Configure click-to-highlight functionality for plotted lines.
         
         Args:
-            lines: List of Line2D objects from the plot
+            lines: List of Line2D objects, or LineCollections holding one line per label
             labels: List of labels corresponding to the lines
         """
         # Store references to all lines and their original styles
@@ -730,16 +734,37 @@ class PortfolioStudyView(QWidget):
             
         # Get the clicked line and its label
         picked_line = event.artist
-        picked_label = picked_line.get_label()
+        if isinstance(picked_line, LineCollection):
+            # Each segment of a collection is one labelled line
+            picked_index = event.ind[0]
+            picked_label = self.plot_labels[picked_index]
+        else:
+            picked_label = picked_line.get_label()
         
         # Reset all lines to default style
         for line in self.plot_lines:
-            line.set_linewidth(1.5)  # Default linewidth
-            line.set_alpha(0.7)      # Slightly transparent
+            if isinstance(line, LineCollection):
+                # A highlighted collection holds per-segment arrays, which a scalar
+                # alpha cannot be compared against, so reset it with arrays too
+                segment_count = len(line.get_paths())
+                line.set_linewidth(np.full(segment_count, 1.5))
+                line.set_alpha(np.full(segment_count, 0.7))
+            else:
+                line.set_linewidth(1.5)  # Default linewidth
+                line.set_alpha(0.7)      # Slightly transparent
             
         # Highlight the picked line
-        picked_line.set_linewidth(3.0)  # Thicker line
-        picked_line.set_alpha(1.0)      # Fully opaque
+        if isinstance(picked_line, LineCollection):
+            segment_count = len(picked_line.get_paths())
+            widths = np.full(segment_count, 1.5)
+            alphas = np.full(segment_count, 0.7)
+            widths[picked_index] = 3.0
+            alphas[picked_index] = 1.0
+            picked_line.set_linewidth(widths)
+            picked_line.set_alpha(alphas)
+        else:
+            picked_line.set_linewidth(3.0)  # Thicker line
+            picked_line.set_alpha(1.0)      # Fully opaque
         
         # Find the legend and highlight the corresponding entry
         legend = self.figure.axes[0].get_legend()